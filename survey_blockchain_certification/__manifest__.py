@@ -18,7 +18,7 @@
         'views/survey_user_input_views.xml',
     ],
     'external_dependencies': {
-        'python': ['web3'],
+        'python': ['web3', 'eth_account'],
     },
     'installable': True,
     'application': False,
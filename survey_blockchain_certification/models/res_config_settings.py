@@ -16,7 +16,17 @@ class ResConfigSettings(models.TransientModel):
     blockchain_wallet_private_key = fields.Char(
         string='Private Key',
         config_parameter='survey_blockchain_certification.blockchain_wallet_private_key',
-        help="Private key of the university wallet to sign transactions.",
+        help="Private key of the university wallet to sign transactions. "
+             "Deprecated: stored in plaintext, prefer an encrypted keystore or the "
+             "SURVEY_BLOCKCHAIN_PRIVATE_KEY environment variable (changes to it require a server restart).",
+    )
+    blockchain_keystore_path = fields.Char(
+        string='Keystore Path',
+        config_parameter='survey_blockchain_certification.blockchain_keystore_path',
+        help="Path on the server to an encrypted JSON keystore of the university wallet. "
+             "The password is read from the SURVEY_BLOCKCHAIN_KEYSTORE_PASSWORD environment variable. "
+             "Changes to the keystore file or to SURVEY_BLOCKCHAIN_* environment variables "
+             "require a server restart."
     )
     blockchain_gas_limit = fields.Integer(
         string='Gas Limit',
@@ -1,9 +1,10 @@
 import logging
 import json
-from odoo import models, fields, api, _
+import os
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
 
-from ..utils import CONTRACT_ABI
+from ..utils import CONTRACT_ABI, BlockchainSettings
 
 _logger = logging.getLogger(__name__)
 
@@ -13,9 +14,16 @@ try:
         # Silencia la advertencia de depreciación de 'websockets' usada por 'web3'
         warnings.filterwarnings("ignore", category=DeprecationWarning)
         from web3 import Web3
+        from eth_account import Account
 except ImportError:
     _logger.warning("Web3 library not found. Blockchain integration will not work.")
     Web3 = None
+    Account = None
+
+# Variables de entorno para cargar la clave de firma fuera de ir.config_parameter
+ENV_PRIVATE_KEY = 'SURVEY_BLOCKCHAIN_PRIVATE_KEY'
+ENV_KEYSTORE_PATH = 'SURVEY_BLOCKCHAIN_KEYSTORE_PATH'
+ENV_KEYSTORE_PASSWORD = 'SURVEY_BLOCKCHAIN_KEYSTORE_PASSWORD'
 
 
 class SurveyUserInput(models.Model):
@@ -41,6 +49,58 @@ class SurveyUserInput(models.Model):
     # Agregado para soportar la lógica de vista 'invisible="not certification"'
     certification = fields.Boolean(related='survey_id.certification', string='Certification', readonly=True)
 
+    @api.model
+    @tools.ormcache('with_signer')
+    def _get_blockchain_settings(self, with_signer=False):
+        """ Devuelve la configuración blockchain; con with_signer=True incluye la cuenta
+        de firma ya construida. Se cachea por registro y se invalida al modificar los
+        parámetros del sistema. Si la clave no se puede cargar se lanza la excepción,
+        de modo que ormcache no guarda el fallo. """
+        params = self.env['ir.config_parameter'].sudo()
+        return BlockchainSettings(
+            rpc_url=params.get_param('survey_blockchain_certification.blockchain_rpc_url'),
+            contract_address=params.get_param('survey_blockchain_certification.blockchain_contract_address'),
+            gas_limit=int(params.get_param('survey_blockchain_certification.blockchain_gas_limit', 200000)),
+            account=self._load_blockchain_signer(params) if with_signer else None,
+        )
+
+    @api.model
+    def _load_blockchain_signer(self, params):
+        """ Construye la cuenta de firma. Orden de prioridad:
+        1. Clave privada en la variable de entorno SURVEY_BLOCKCHAIN_PRIVATE_KEY.
+        2. Keystore JSON cifrado (ruta en ajustes o en SURVEY_BLOCKCHAIN_KEYSTORE_PATH),
+           con la contraseña en SURVEY_BLOCKCHAIN_KEYSTORE_PASSWORD.
+        3. Clave privada en texto plano en ir.config_parameter (obsoleto).
+        Los cambios en las variables de entorno o en el fichero keystore requieren reiniciar. """
+        private_key = os.environ.get(ENV_PRIVATE_KEY)
+        if private_key:
+            return Account.from_key(private_key)
+
+        keystore_path = os.environ.get(ENV_KEYSTORE_PATH) or \
+            params.get_param('survey_blockchain_certification.blockchain_keystore_path')
+        if keystore_path:
+            password = os.environ.get(ENV_KEYSTORE_PASSWORD)
+            if password is None:
+                raise UserError(_("A blockchain keystore is configured (%s) but the %s environment variable is not set.")
+                                % (keystore_path, ENV_KEYSTORE_PASSWORD))
+            try:
+                with open(keystore_path) as keystore_file:
+                    keystore = json.load(keystore_file)
+            except (OSError, ValueError) as e:
+                raise UserError(_("Could not read blockchain keystore %s: %s") % (keystore_path, e))
+            try:
+                return Account.from_key(Account.decrypt(keystore, password))
+            except ValueError as e:
+                raise UserError(_("Could not decrypt blockchain keystore %s: %s") % (keystore_path, e))
+
+        private_key = params.get_param('survey_blockchain_certification.blockchain_wallet_private_key')
+        if private_key:
+            _logger.warning("Blockchain private key is stored in plaintext in system parameters. "
+                            "Use an encrypted keystore or the %s environment variable instead.", ENV_PRIVATE_KEY)
+            return Account.from_key(private_key)
+
+        raise UserError(_("Blockchain signing key is missing (environment variable, keystore or Private Key)."))
+
     def _mark_done(self):
         """ Sobrescribe para activar el registro en blockchain al aprobar la certificación """
         res = super(SurveyUserInput, self)._mark_done()
@@ -71,14 +131,21 @@ class SurveyUserInput(models.Model):
             })
             return
 
-        # 1. Obtener Credenciales
-        params = self.env['ir.config_parameter'].sudo()
-        rpc_url = params.get_param('survey_blockchain_certification.blockchain_rpc_url')
-        contract_address = params.get_param('survey_blockchain_certification.blockchain_contract_address')
-        private_key = params.get_param('survey_blockchain_certification.blockchain_wallet_private_key')
-        gas_limit = int(params.get_param('survey_blockchain_certification.blockchain_gas_limit', 200000))
+        # 1. Obtener Credenciales (snapshot cacheado, con la cuenta de firma)
+        try:
+            settings = self._get_blockchain_settings(with_signer=True)
+        except Exception as e:
+            _logger.exception("Could not load blockchain settings")
+            self.write({
+                'blockchain_error_msg': f"Revocation Failed: {str(e)}"
+            })
+            return
+        rpc_url = settings.rpc_url
+        contract_address = settings.contract_address
+        account = settings.account
+        gas_limit = settings.gas_limit
 
-        if not all([rpc_url, contract_address, private_key]):
+        if not all([rpc_url, contract_address]):
             self.write({
                 'blockchain_error_msg': "Blockchain configuration is missing."
             })
@@ -95,7 +162,6 @@ class SurveyUserInput(models.Model):
             contract = w3.eth.contract(address=checksum_address, abi=CONTRACT_ABI)
 
             # 4. Preparar Transacción de Revocación
-            account = w3.eth.account.from_key(private_key)
             nonce = w3.eth.get_transaction_count(account.address)
             chain_id = w3.eth.chain_id
 
@@ -110,7 +176,7 @@ class SurveyUserInput(models.Model):
             })
 
             # 5. Firmar y Enviar
-            signed_txn = w3.eth.account.sign_transaction(txn, private_key=private_key)
+            signed_txn = account.sign_transaction(txn)
             tx_hash_bytes = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
             
             # 6. Esperar confirmación
@@ -149,17 +215,25 @@ class SurveyUserInput(models.Model):
             })
             return
 
-        # 1. Obtener Credenciales
-        params = self.env['ir.config_parameter'].sudo()
-        rpc_url = params.get_param('survey_blockchain_certification.blockchain_rpc_url')
-        contract_address = params.get_param('survey_blockchain_certification.blockchain_contract_address')
-        private_key = params.get_param('survey_blockchain_certification.blockchain_wallet_private_key')
-        gas_limit = int(params.get_param('survey_blockchain_certification.blockchain_gas_limit', 200000))
+        # 1. Obtener Credenciales (snapshot cacheado, con la cuenta de firma)
+        try:
+            settings = self._get_blockchain_settings(with_signer=True)
+        except Exception as e:
+            _logger.exception("Could not load blockchain settings")
+            self.write({
+                'blockchain_status': 'error',
+                'blockchain_error_msg': str(e)
+            })
+            return
+        rpc_url = settings.rpc_url
+        contract_address = settings.contract_address
+        account = settings.account
+        gas_limit = settings.gas_limit
 
-        if not all([rpc_url, contract_address, private_key]):
+        if not all([rpc_url, contract_address]):
             self.write({
                 'blockchain_status': 'error',
-                'blockchain_error_msg': "Blockchain configuration is missing (URL, Address or Private Key)."
+                'blockchain_error_msg': "Blockchain configuration is missing (URL or Address)."
             })
             return
 
@@ -179,7 +253,6 @@ class SurveyUserInput(models.Model):
             course_name = self.survey_id.title or "Unknown Course"
             
             # Configuración de la cuenta
-            account = w3.eth.account.from_key(private_key)
             nonce = w3.eth.get_transaction_count(account.address)
             chain_id = w3.eth.chain_id
 
@@ -196,7 +269,7 @@ class SurveyUserInput(models.Model):
             })
 
             # 5. Firmar Transacción
-            signed_txn = w3.eth.account.sign_transaction(txn, private_key=private_key)
+            signed_txn = account.sign_transaction(txn)
 
             # 6. Enviar Transacción
             tx_hash_bytes = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
@@ -250,9 +323,9 @@ class SurveyUserInput(models.Model):
         if not Web3:
             raise UserError("Web3 library is not installed.")
 
-        params = self.env['ir.config_parameter'].sudo()
-        rpc_url = params.get_param('survey_blockchain_certification.blockchain_rpc_url')
-        contract_address = params.get_param('survey_blockchain_certification.blockchain_contract_address')
+        settings = self._get_blockchain_settings()
+        rpc_url = settings.rpc_url
+        contract_address = settings.contract_address
         
         if not rpc_url or not contract_address:
             raise UserError(_("Blockchain configuration is missing."))
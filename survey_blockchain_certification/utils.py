@@ -1,3 +1,18 @@
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from eth_account.signers.local import LocalAccount
+
+
+class BlockchainSettings(NamedTuple):
+    """ Snapshot inmutable de la configuración blockchain (ver _get_blockchain_settings).
+    La cuenta de firma solo se carga en las rutas de emisión y revocación. """
+    rpc_url: Optional[str]
+    contract_address: Optional[str]
+    gas_limit: int
+    account: Optional["LocalAccount"]
+
+
 # ABI - Interfaz Binaria de Aplicación
 CONTRACT_ABI = [
     {